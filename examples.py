@@ -1,4 +1,5 @@
 from pixoo import Channel, ImageResampleMode, Pixoo
+from pixoo.tools import ScoreBoard
 
 '''
 Create a connection to a Pixoo
@@ -73,6 +74,14 @@ pixoo.draw_image('tiny.png', (-10, -14), ImageResampleMode.SMOOTH)  # Resizes th
 # or
 pixoo.draw_image_at_location('tiny.png', 10, 10)  # Alternative way of providing coordinates
 
+'''
+Replace the whole buffer at once with RGB data you've prepared yourself (3 bytes per pixel, row by row)
+
+This is the fastest way to get a frame rendered elsewhere (numpy, OpenCV, Pillow, ...) on the display. Anything that
+supports the buffer protocol works, e.g. bytes, a Pillow image's `tobytes()` or a (64, 64, 3) uint8 numpy array
+'''
+pixoo.draw_buffer(bytes([255, 0, 68]) * 64 * 64)
+
 '''
 Draw a line from point start to stop with a given color
 '''
@@ -145,3 +154,13 @@ NOTE: Currently this is **not** a drawing method, so it'll add the text over wha
 # Send text after pushing all your other data, because it'll otherwise be overwritten if it's not animated
 pixoo.send_text('Hello there', (0, 0), (10, 255, 0), 1, 6)
 pixoo.send_text('GENERAL KENOBI', (0, 15), (255, 0, 0), 2, 6)
+
+'''
+Show the scoreboard tool and keep its scores up to date
+
+Scores are clamped between 0 and 999. Assigning a score that didn't change doesn't send anything to the device, and
+`set_scores` updates both scores with a single request
+'''
+scoreboard = ScoreBoard(pixoo)
+scoreboard.blue_score = 1
+scoreboard.set_scores(blue=2, red=3)
@@ -1,10 +1,15 @@
-import base64
+import binascii
+import functools
+import hashlib
+import queue
+import threading
 from enum import IntEnum
 
 from PIL import Image, ImageOps
 
+from . import _draw
 from ._colors import Palette
-from ._font import retrieve_glyph
+from ._font import retrieve_glyph_offsets, retrieve_text_offsets
 from .simulator import Simulator, SimulatorConfig
 from pixoo.find_device import get_pixoo_devices as _get_pixoo_devices
 import pixoo.exceptions as _exceptions
@@ -21,7 +26,13 @@ def clamp(value, minimum=0, maximum=255):
 
 
 def clamp_color(rgb):
-    return clamp(rgb[0]), clamp(rgb[1]), clamp(rgb[2])
+    r, g, b = rgb[0], rgb[1], rgb[2]
+
+    # Most colors are valid already, so skip the per-channel clamping for those
+    if 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255:
+        return r, g, b
+
+    return clamp(r), clamp(g), clamp(b)
 
 
 def lerp(start, end, interpolant):
@@ -51,9 +62,13 @@ class Channel(IntEnum):
     CUSTOM = 3
 
 
+# Pillow 9.1 moved the resampling filters into their own enum
+_Resampling = getattr(Image, 'Resampling', Image)
+
+
 class ImageResampleMode(IntEnum):
-    PIXEL_ART = Image.NEAREST
-    SMOOTH = Image.LANCZOS
+    PIXEL_ART = _Resampling.NEAREST
+    SMOOTH = _Resampling.LANCZOS
 
 
 class TextScrollDirection(IntEnum):
@@ -62,14 +77,19 @@ class TextScrollDirection(IntEnum):
 
 
 class Pixoo(PixooBaseApi):
-    __buffer = []
+    __buffer = bytearray()
     __buffers_send = 0
     __counter = 0
+    __pushed_digest = None
     __refresh_counter_limit = 32
+    __send_error = None
+    __send_queue = None
+    __send_queue_limit = 16
+    __send_thread = None
     __simulator = None
 
     def __init__(self, address=None, size=64, debug=False, refresh_connection_automatically=True, simulated=False,
-                 simulation_config=SimulatorConfig()):
+                 simulation_config=SimulatorConfig(), async_send=False):
         assert size in [16, 32, 64], \
             'Invalid screen size in pixels given. ' \
             'Valid options are 16, 32, and 64'
@@ -87,15 +107,35 @@ class Pixoo(PixooBaseApi):
         # Total number of pixels
         self.pixel_count = self.size * self.size
 
+        # The size is a power of two, so any location with bits set outside of
+        # this mask is off screen
+        self.__outside_mask = ~(self.size - 1)
+
         # Generate URL
         self.__url = 'http://{0}/post'.format(self.address)
 
+        # Everything but the counter and the pixel data is the same for every
+        # frame, so encode that part of the JSON only once
+        self.__frame_prefix = (
+            '{"Command":"Draw/SendHttpGif","PicNum":1,'
+            f'"PicWidth":{self.size},"PicOffset":0,"PicSpeed":1000,"PicId":'
+        ).encode('ascii')
+
+        # Allocate the buffer once, every draw method writes into it in place
+        self.__buffer = bytearray(self.pixel_count * 3)
+
         # Prefill the buffer
         self.fill()
 
         # Retrieve the counter
         self.__load_counter()
 
+        # Hand commands that don't need a response to a background sender
+        if async_send and not self.simulated:
+            self.__send_queue = queue.Queue(self.__send_queue_limit)
+            self.__send_thread = threading.Thread(target=self.__process_send_queue, daemon=True)
+            self.__send_thread.start()
+
         # Resetting if needed
         if self.refresh_connection_automatically and self.__counter > self.__refresh_counter_limit:
             self.__reset_counter()
@@ -121,14 +161,41 @@ class Pixoo(PixooBaseApi):
     def clear_rgb(self, r, g, b):
         self.fill_rgb(r, g, b)
 
+    def close(self):
+        """ Send what's still queued, stop the background sender and close the connection """
+        if self.__send_queue is not None:
+            # Everything queued before the sentinel is still sent
+            self.__send_queue.put(None)
+            self.__send_thread.join()
+            self.__send_queue = None
+            self.__send_thread = None
+
+        super().close()
+
+        # Surface the last failure of the background sender to the caller
+        error, self.__send_error = self.__send_error, None
+        if error is not None:
+            raise error
+
+    def draw_buffer(self, data):
+        """ Replace the whole buffer with prepared RGB data
+
+        Accepts anything that supports the buffer protocol and holds exactly
+        size * size * 3 bytes, row by row: bytes, bytearray, a Pillow
+        image's tobytes() or a C-contiguous (size, size, 3) uint8 numpy array.
+        """
+        data = memoryview(data).cast('B')
+        assert len(data) == len(self.__buffer), \
+            f'Invalid buffer length given: {len(data)} ' \
+            f'(expected {len(self.__buffer)} bytes)'
+
+        self.__buffer[:] = data
+
     def draw_character(self, character, xy=(0, 0), rgb=Palette.WHITE):
-        matrix = retrieve_glyph(character)
-        if matrix is not None:
-            for index, bit in enumerate(matrix):
-                if bit == 1:
-                    local_x = index % 3
-                    local_y = int(index / 3)
-                    self.draw_pixel((xy[0] + local_x, xy[1] + local_y), rgb)
+        offsets = retrieve_glyph_offsets(character)
+        if offsets is not None:
+            _draw.stamp(self.__buffer, self.size, xy[0], xy[1], offsets,
+                        clamp_color(rgb))
 
     def draw_character_at_location_rgb(self, character, x=0, y=0, r=255, g=255,
                                        b=255):
@@ -136,9 +203,10 @@ class Pixoo(PixooBaseApi):
 
     def draw_filled_rectangle(self, top_left_xy=(0, 0), bottom_right_xy=(1, 1),
                               rgb=Palette.BLACK):
-        for y in range(top_left_xy[1], bottom_right_xy[1] + 1):
-            for x in range(top_left_xy[0], bottom_right_xy[0] + 1):
-                self.draw_pixel((x, y), rgb)
+        _draw.fill_rectangle(self.__buffer, self.size,
+                             top_left_xy[0], top_left_xy[1],
+                             bottom_right_xy[0], bottom_right_xy[1],
+                             clamp_color(rgb))
 
     def draw_filled_rectangle_from_top_left_to_bottom_right_rgb(self,
                                                                 top_left_x=0,
@@ -161,60 +229,62 @@ class Pixoo(PixooBaseApi):
 
         # See if it needs to be scaled/resized to fit the display
         if width > self.size or height > self.size:
+            # Pillow only needs the plain filter number
+            resample = int(image_resample_mode)
             if pad_resample:
-                image = ImageOps.pad(image, (self.size, self.size),
-                                     image_resample_mode)
+                image = ImageOps.pad(image, (self.size, self.size), resample)
             else:
-                image.thumbnail((self.size, self.size), image_resample_mode)
+                image.thumbnail((self.size, self.size), resample)
 
             if self.debug:
                 print(
                     f'[.] Resized image to fit on screen (saving aspect ratio): "{image_path_or_object}" ({width}, {height}) '
                     f'-> ({image.size[0]}, {image.size[1]})')
 
+        # Work out which part of the image actually ends up on screen
+        source_x = max(0, -xy[0])
+        source_y = max(0, -xy[1])
+        placed_x = xy[0] + source_x
+        placed_y = xy[1] + source_y
+        visible_width = min(image.size[0] - source_x, self.size - placed_x)
+        visible_height = min(image.size[1] - source_y, self.size - placed_y)
+        if visible_width <= 0 or visible_height <= 0:
+            return
+
+        # Only convert and composite the visible part
+        if (visible_width, visible_height) != image.size:
+            image = image.crop((source_x, source_y,
+                                source_x + visible_width,
+                                source_y + visible_height))
+
+        if image.mode == 'RGB' and 'transparency' not in image.info:
+            # Nothing is transparent, so the rows can be copied straight over
+            _draw.blit(self.__buffer, self.size, placed_x, placed_y,
+                       visible_width, visible_height, image.tobytes())
+            return
+
         # Convert the loaded image to RGBA to also support transparency
-        rgb_image = image.convert('RGBA')
-
-        # Iterate over all pixels in the image that are left and buffer them
-        for y in range(image.size[1]):
-            for x in range(image.size[0]):
-                location = (x, y)
-                if rgb_image.getpixel(location)[3] == 0:
-                    continue
-                placed_x = x + xy[0]
-                if self.size - 1 < placed_x or placed_x < 0:
-                    continue
-
-                placed_y = y + xy[1]
-                if self.size - 1 < placed_y or placed_y < 0:
-                    continue
-                self.draw_pixel((placed_x, placed_y),
-                                rgb_image.getpixel(location))
+        rgba_image = image.convert('RGBA')
+
+        # Fully transparent pixels leave the buffer untouched, everything else
+        # is copied over as-is (the alpha channel isn't blended)
+        mask = rgba_image.getchannel('A').point(lambda alpha: 255 if alpha else 0)
+
+        # Let Pillow do the compositing in one go on a copy of the buffer, then
+        # copy the result back in a single slice assignment
+        canvas = Image.frombytes('RGB', (self.size, self.size), self.__buffer)
+        canvas.paste(rgba_image.convert('RGB'), (placed_x, placed_y), mask)
+        self.__buffer[:] = canvas.tobytes()
 
     def draw_image_at_location(self, image_path_or_object, x, y,
                                image_resample_mode=ImageResampleMode.PIXEL_ART):
         self.draw_image(image_path_or_object, (x, y), image_resample_mode)
 
     def draw_line(self, start_xy, stop_xy, rgb=Palette.WHITE):
-        line = set()
-
-        # Calculate the amount of steps needed between the points to draw a nice line
-        amount_of_steps = minimum_amount_of_steps(start_xy, stop_xy)
-
-        # Iterate over them and create a nice set of pixels
-        for step in range(amount_of_steps):
-            if amount_of_steps == 0:
-                interpolant = 0
-            else:
-                interpolant = step / amount_of_steps
-
-            # Add a pixel as a rounded location
-            line.add(
-                round_location(lerp_location(start_xy, stop_xy, interpolant)))
-
-        # Draw the actual pixel line
-        for pixel in line:
-            self.draw_pixel(pixel, rgb)
+        x, y = round_location(start_xy)
+        stop_x, stop_y = round_location(stop_xy)
+        _draw.draw_line(self.__buffer, self.size, x, y, stop_x, stop_y,
+                        clamp_color(rgb))
 
     def draw_line_from_start_to_stop_rgb(self, start_x, start_y, stop_x, stop_y,
                                          r=255, g=255, b=255):
@@ -222,18 +292,22 @@ class Pixoo(PixooBaseApi):
 
     def draw_pixel(self, xy, rgb):
         # If it's not on the screen, we're not going to bother
-        if xy[0] < 0 or xy[0] >= self.size or xy[1] < 0 or xy[1] >= self.size:
+        if (xy[0] | xy[1]) & self.__outside_mask:
             if self.debug:
                 limit = self.size - 1
                 print(
                     f'[!] Invalid coordinates given: ({xy[0]}, {xy[1]}) (maximum coordinates are ({limit}, {limit})')
             return
 
-        # Calculate the index
-        index = xy[0] + (xy[1] * self.size)
+        # Clamp the color, just to be safe
+        r, g, b = clamp_color(rgb)
 
-        # Color it
-        self.draw_pixel_at_index(index, rgb)
+        # The location is valid, so the index is too and can be colored directly
+        index = (xy[0] + (xy[1] * self.size)) * 3
+        buffer = self.__buffer
+        buffer[index] = r
+        buffer[index + 1] = g
+        buffer[index + 2] = b
 
     def draw_pixel_at_index(self, index, rgb):
         # Validate the index
@@ -243,14 +317,14 @@ class Pixoo(PixooBaseApi):
             return
 
         # Clamp the color, just to be safe
-        rgb = clamp_color(rgb)
+        r, g, b = clamp_color(rgb)
 
         # Move to place in array
         index = index * 3
-
-        self.__buffer[index] = rgb[0]
-        self.__buffer[index + 1] = rgb[1]
-        self.__buffer[index + 2] = rgb[2]
+        buffer = self.__buffer
+        buffer[index] = r
+        buffer[index + 1] = g
+        buffer[index + 2] = b
 
     def draw_pixel_at_index_rgb(self, index, r, g, b):
         self.draw_pixel_at_index(index, (r, g, b))
@@ -259,21 +333,31 @@ class Pixoo(PixooBaseApi):
         self.draw_pixel((x, y), (r, g, b))
 
     def draw_text(self, text, xy=(0, 0), rgb=Palette.WHITE):
-        for index, character in enumerate(text):
-            self.draw_character(character, (index * 4 + xy[0], xy[1]), rgb)
+        # Recurring strings (clocks, scores, ...) are laid out only once
+        _draw.stamp(self.__buffer, self.size, xy[0], xy[1],
+                    retrieve_text_offsets(text), clamp_color(rgb))
 
     def draw_text_at_location_rgb(self, text, x, y, r, g, b):
         self.draw_text(text, (x, y), (r, g, b))
 
     def fill(self, rgb=Palette.BLACK):
-        self.__buffer = []
-        rgb = clamp_color(rgb)
-        for index in range(self.pixel_count):
-            self.__buffer.extend(rgb)
+        _draw.fill(self.__buffer, clamp_color(rgb))
 
     def fill_rgb(self, r, g, b):
         self.fill((r, g, b))
 
+    def flush(self):
+        """ Wait until all queued commands have been sent (only with async_send) """
+        if self.__send_queue is None:
+            return
+
+        self.__send_queue.join()
+
+        # Surface the last failure of the background sender to the caller
+        error, self.__send_error = self.__send_error, None
+        if error is not None:
+            raise error
+
     def get_settings(self):
         response = requests.post(self.__url, json.dumps({
             'Command': 'Channel/GetAllConf'
@@ -284,8 +368,23 @@ class Pixoo(PixooBaseApi):
         else:
             return {key: val for key, val in data.items() if key != 'error_code'}
 
-    def push(self):
-        self.__send_buffer()
+    def push(self, force=False):
+        # Don't bother the device with a frame it's already showing, unless
+        # asked to (e.g. to take the screen back after it was switched away)
+        digest = hashlib.blake2b(self.__buffer, digest_size=8).digest()
+        if not force and digest == self.__pushed_digest:
+            if self.debug:
+                print('[.] Buffer unchanged since last push, skipping')
+            return
+
+        self.__send_buffer(digest)
+
+    def send_command(self, command, timeout=60, **arguments):
+        # Any command might change what's on screen, so make sure the next
+        # push goes through even if the buffer didn't change
+        self.__pushed_digest = None
+
+        return super().send_command(command, timeout, **arguments)
 
     def send_text(self, text, xy=(0, 0), color=Palette.WHITE, identifier=1,
                   font=2, width=64,
@@ -298,12 +397,12 @@ class Pixoo(PixooBaseApi):
 
         # Make sure the identifier is valid
         identifier = clamp(identifier, 0, 19)
-        self.send_command(
+        self.__send(
             command="Draw/SendText",
             text_id=identifier,
             x=xy[0],
             y=xy[1],
-            dir=direction,
+            dir=int(direction),
             font=font,
             text_width=width,
             speed=movement_speed,
@@ -318,7 +417,7 @@ class Pixoo(PixooBaseApi):
             return
 
         brightness = clamp(brightness, 0, 100)
-        self.send_command(
+        self.__send(
             command="Channel/SetBrightness",
             brightness=brightness,
         )
@@ -328,9 +427,9 @@ class Pixoo(PixooBaseApi):
         if self.simulated:
             return
 
-        self.send_command(
+        self.__send(
             command="Channel/SetIndex",
-            select_index=channel,
+            select_index=int(channel),
         )
 
     def set_clock(self, clock_id):
@@ -338,7 +437,7 @@ class Pixoo(PixooBaseApi):
         if self.simulated:
             return
 
-        self.send_command(
+        self.__send(
             command="Channel/SetClockSelectId",
             clock_id=clock_id,
         )
@@ -348,7 +447,7 @@ class Pixoo(PixooBaseApi):
         self.set_channel(3)
 
     def set_custom_page(self, index):
-        self.send_command(
+        self.__send(
             command="Channel/SetCustomPageIndex",
             custom_page_index=index,
         )
@@ -356,12 +455,23 @@ class Pixoo(PixooBaseApi):
     def set_face(self, face_id):
         self.set_clock(face_id)
 
+    def set_scoreboard(self, blue_score, red_score):
+        # This won't be possible
+        if self.simulated:
+            return
+
+        self.__send(
+            command="Tools/SetScoreBoard",
+            blue_score=clamp(blue_score, 0, 999),
+            red_score=clamp(red_score, 0, 999),
+        )
+
     def set_screen(self, on=True):
         # This won't be possible
         if self.simulated:
             return
 
-        self.send_command(
+        self.__send(
             command="Channel/OnOffScreen",
             on_off=1 if on else 0,
         )
@@ -377,7 +487,7 @@ class Pixoo(PixooBaseApi):
         if self.simulated:
             return
 
-        self.send_command(
+        self.__send(
             command="Channel/SetEqPosition",
             eq_position=equalizer_position,
         )
@@ -401,7 +511,36 @@ class Pixoo(PixooBaseApi):
         if self.debug:
             print('[.] Counter loaded and stored: ' + str(self.__counter))
 
-    def __send_buffer(self):
+    def __dispatch(self, send):
+        if self.__send_queue is None:
+            send()
+        else:
+            self.__send_queue.put(send)
+
+    def __process_send_queue(self):
+        while True:
+            send = self.__send_queue.get()
+            if send is None:
+                self.__send_queue.task_done()
+                return
+
+            try:
+                send()
+            except Exception as error:  # pylint: disable=broad-except
+                # The frame never made it, so the next push has to go through
+                self.__pushed_digest = None
+                self.__send_error = error
+                self.__error(error)
+            finally:
+                self.__send_queue.task_done()
+
+    def __send(self, command, **arguments):
+        # The command might only be sent later on, so don't wait for
+        # send_command to forget what's on screen
+        self.__pushed_digest = None
+        self.__dispatch(functools.partial(self.send_command, command, **arguments))
+
+    def __send_buffer(self, digest=None):
 
         # Add to the internal counter
         self.__counter = self.__counter + 1
@@ -420,18 +559,26 @@ class Pixoo(PixooBaseApi):
 
             # Simulate this too I suppose
             self.__buffers_send = self.__buffers_send + 1
+            self.__pushed_digest = digest
             return
 
-        # Encode the buffer to base64 encoding
-        self.send_command(
-            command="Draw/SendHttpGif",
-            pic_num=1,
-            pic_width=self.size,
-            pic_offset=0,
-            pic_id=self.__counter,
-            pic_speed=1000,
-            pic_data=str(base64.b64encode(bytearray(self.__buffer)).decode()),
-        )
+        # Encode the buffer to base64 encoding and wrap it in the frame command
+        payload = b''.join((
+            self.__frame_prefix,
+            str(self.__counter).encode('ascii'),
+            b',"PicData":"',
+            binascii.b2a_base64(self.__buffer, newline=False),
+            b'"}',
+        ))
+
+        # Remember the frame before it's handed off, the background sender
+        # forgets it again if sending fails
+        self.__pushed_digest = digest
+        try:
+            self.__dispatch(functools.partial(self.send_payload, payload))
+        except Exception:
+            self.__pushed_digest = None
+            raise
         self.__buffers_send = self.__buffers_send + 1
 
         if self.debug:
@@ -445,7 +592,7 @@ class Pixoo(PixooBaseApi):
         if self.simulated:
             return
 
-        self.send_command(
+        self.__send(
             command="Draw/ResetHttpGifId",
         )
 
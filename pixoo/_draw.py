@@ -0,0 +1,100 @@
+""" Drawing kernels that operate directly on a flat RGB buffer
+
+Every function takes the buffer (a bytearray holding size * size * 3 bytes)
+and an already clamped (r, g, b) color, and mutates the buffer in place.
+Screen sizes are always a power of two, so a coordinate pair is on screen
+exactly when neither coordinate has a bit set outside of size - 1.
+"""
+
+
+def fill(buffer, rgb):
+    """ Set every pixel of the buffer to the given color """
+    buffer[:] = bytes(rgb) * (len(buffer) // 3)
+
+
+def fill_rectangle(buffer, size, x0, y0, x1, y1, rgb):
+    """ Fill the rectangle between both corners (inclusive), clipped to the screen """
+    x0 = max(x0, 0)
+    y0 = max(y0, 0)
+    x1 = min(x1, size - 1)
+    y1 = min(y1, size - 1)
+    if x0 > x1 or y0 > y1:
+        return
+
+    row = bytes(rgb) * (x1 - x0 + 1)
+    if len(row) == size * 3:
+        # Whole rows line up, so it's a single contiguous fill
+        buffer[y0 * len(row):(y1 + 1) * len(row)] = row * (y1 - y0 + 1)
+        return
+
+    # Fill each row with a single slice assignment
+    for y in range(y0, y1 + 1):
+        index = (y * size + x0) * 3
+        buffer[index:index + len(row)] = row
+
+
+def blit(buffer, size, x, y, width, height, data):
+    """ Copy width x height RGB data to x, y, which has to fit on the screen """
+    row_length = width * 3
+    if row_length == size * 3:
+        # Whole rows line up, so it's a single contiguous copy
+        index = y * size * 3
+        buffer[index:index + len(data)] = data
+        return
+
+    # Slicing a memoryview doesn't copy, so no temporary bytes per row
+    data = memoryview(data)
+    source = 0
+    for row in range(y, y + height):
+        index = (row * size + x) * 3
+        buffer[index:index + row_length] = data[source:source + row_length]
+        source += row_length
+
+
+def stamp(buffer, size, x, y, offsets, rgb):
+    """ Set the pixels at the given (x, y) offsets from x, y, clipped to the screen """
+    r, g, b = rgb
+    outside = ~(size - 1)
+    for offset_x, offset_y in offsets:
+        placed_x = x + offset_x
+        placed_y = y + offset_y
+        if not (placed_x | placed_y) & outside:
+            index = (placed_y * size + placed_x) * 3
+            buffer[index] = r
+            buffer[index + 1] = g
+            buffer[index + 2] = b
+
+
+def draw_line(buffer, size, x, y, stop_x, stop_y, rgb):
+    """ Draw a line between both (integer) points, clipped to the screen """
+    r, g, b = rgb
+    outside = ~(size - 1)
+
+    # Integer Bresenham, stepping one pixel at a time in either direction
+    dx = abs(stop_x - x)
+    dy = -abs(stop_y - y)
+    step_x = 1 if x < stop_x else -1
+    step_y = 1 if y < stop_y else -1
+    error = dx + dy
+
+    while True:
+        # Only color the pixels that are actually on the screen
+        if not (x | y) & outside:
+            index = (y * size + x) * 3
+            buffer[index] = r
+            buffer[index + 1] = g
+            buffer[index + 2] = b
+
+        if x == stop_x and y == stop_y:
+            break
+
+        doubled_error = 2 * error
+        if doubled_error >= dy:
+            error += dy
+            x += step_x
+        if doubled_error <= dx:
+            error += dx
+            y += step_y
+
+
+__all__ = (blit, draw_line, fill, fill_rectangle, stamp)
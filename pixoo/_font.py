@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 FONT_PICO_8 = {'0': [1, 1, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 1, 1], '1': [1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 1, 1],
                '2': [1, 1, 1, 0, 0, 1, 1, 1, 1, 1, 0, 0, 1, 1, 1], '3': [1, 1, 1, 0, 0, 1, 0, 1, 1, 0, 0, 1, 1, 1, 1],
                '4': [1, 0, 1, 1, 0, 1, 1, 1, 1, 0, 0, 1, 0, 0, 1], '5': [1, 1, 1, 1, 0, 0, 1, 1, 1, 0, 0, 1, 1, 1, 1],
@@ -52,8 +54,43 @@ def retrieve_glyph(character):
     return None
 
 
+@lru_cache(maxsize=None)
+def retrieve_glyph_offsets(character):
+    """ Return the (x, y) offsets of the lit pixels of a glyph, or None """
+    matrix = retrieve_glyph(character)
+    if matrix is None:
+        return None
+
+    return tuple((index % 3, index // 3) for index, bit in enumerate(matrix) if bit == 1)
+
+
+def retrieve_text_offsets(text):
+    """ Return the (x, y) offsets of the lit pixels of a whole string """
+    # Only strings can be cached, other iterables of characters are laid out
+    # every time
+    if isinstance(text, str):
+        return _retrieve_string_offsets(text)
+
+    return _layout_text(text)
+
+
+@lru_cache(maxsize=256)
+def _retrieve_string_offsets(text):
+    return _layout_text(text)
+
+
+def _layout_text(text):
+    offsets = []
+    for index, character in enumerate(text):
+        glyph_offsets = retrieve_glyph_offsets(character)
+        if glyph_offsets is not None:
+            offsets.extend((index * 4 + x, y) for x, y in glyph_offsets)
+
+    return tuple(offsets)
+
+
 def supported_characters():
     return FONT_PICO_8.keys()
 
 
-__all__ = (retrieve_glyph, supported_characters, FONT_PICO_8)
+__all__ = (retrieve_glyph, retrieve_glyph_offsets, retrieve_text_offsets, supported_characters, FONT_PICO_8)
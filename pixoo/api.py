@@ -1,6 +1,7 @@
 #!/bin/python3
 """ Better interaction with request module and pixoo API """
 import requests
+from requests.adapters import HTTPAdapter
 import pixoo.exceptions as _exceptions
 
 
@@ -42,6 +43,18 @@ class PixooBaseApi:
     """ Talk with Pixoo API """
     def __init__(self, address: str):
         self.__address = address
+        self.__url = f"http://{address}/post"
+        # Keep a single connection to the device alive between commands
+        self.__session = requests.Session()
+        # The device is on the local network, so skip looking up proxy and
+        # netrc settings from the environment on every single request
+        self.__session.trust_env = False
+        self.__session.mount(
+            "http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+    def close(self):
+        """ Close the connection to Pixoo API """
+        self.__session.close()
 
     def send_command(self, command: str, timeout=60, **arguments):
         """ Send command to Pixoo API """
@@ -50,6 +63,12 @@ class PixooBaseApi:
         # Send arguments taken in snake_case to camelCase
         for arg, value in arguments.items():
             data.update({_snake_to_camel(arg): value})
-        response = requests.post(
-            f"http://{self.__address}/post", json=data, timeout=timeout)
+        response = self.__session.post(self.__url, json=data, timeout=timeout)
+        return _get_cmd_response(response)
+
+    def send_payload(self, payload: bytes, timeout=60):
+        """ Send an already JSON encoded command to Pixoo API """
+        response = self.__session.post(
+            self.__url, data=payload, timeout=timeout,
+            headers={"Content-Type": "application/json"})
         return _get_cmd_response(response)
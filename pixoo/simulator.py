@@ -53,7 +53,7 @@ class Simulator:
 
     def display(self, buffer, counter):
         # Convert our buffer to a nice image
-        image = Image.frombytes('RGB', self.__screen_size, bytes(buffer), 'raw')
+        image = Image.frombytes('RGB', self.__screen_size, buffer, 'raw')
 
         # Scale it up and convert it to something useful
         image = self.__prepare_image(image)
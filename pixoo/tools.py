@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+""" Helpers for the built-in tools of the Pixoo (scoreboard, ...) """
+
+
+def _clamp_score(score):
+    """ Scores on the device go from 0 up to and including 999 """
+    return min(max(score, 0), 999)
+
+
+class ScoreBoard:
+    """ Keep track of the scoreboard tool and only update it on changes """
+    def __init__(self, pixoo, blue_score=0, red_score=0):
+        self.__pixoo = pixoo
+        self.__blue_score = _clamp_score(blue_score)
+        self.__red_score = _clamp_score(red_score)
+        self.__pixoo.set_scoreboard(self.__blue_score, self.__red_score)
+
+    def set_scores(self, blue=None, red=None):
+        """ Update one or both scores with a single command, if they changed """
+        blue = self.__blue_score if blue is None else _clamp_score(blue)
+        red = self.__red_score if red is None else _clamp_score(red)
+        if blue == self.__blue_score and red == self.__red_score:
+            return
+
+        self.__pixoo.set_scoreboard(blue, red)
+        self.__blue_score = blue
+        self.__red_score = red
+
+    @property
+    def blue_score(self):
+        """ Get the blue score """
+        return self.__blue_score
+
+    @blue_score.setter
+    def blue_score(self, value):
+        self.set_scores(blue=value)
+
+    @property
+    def red_score(self):
+        """ Get the red score """
+        return self.__red_score
+
+    @red_score.setter
+    def red_score(self, value):
+        self.set_scores(red=value)